@@ -1,3 +1,4 @@
+import asyncio
 import dataclasses
 import io
 import json
@@ -102,7 +103,7 @@ from prepdocs import (
     setup_openai_client,
     setup_search_info,
 )
-from prepdocslib.blobmanager import AdlsBlobManager, BlobManager
+from prepdocslib.blobmanager import AdlsBlobManager, BlobManager, SessionChunksReader
 from prepdocslib.embeddings import ImageEmbeddings
 from prepdocslib.filestrategy import UploadUserFileStrategy
 from prepdocslib.listfilestrategy import File
@@ -356,6 +357,7 @@ async def speech():
 # Limits for zip upload (React app codebase)
 MAX_ZIP_SIZE_BYTES = 50 * 1024 * 1024  # 50 MB
 MAX_ZIP_FILE_COUNT = 30000
+MAX_ZIP_EXTRACTED_BYTES = 500 * 1024 * 1024  # 500 MB
 ZIP_CHUNK_SIZE = 4 * 1024 * 1024  # 4 MB per chunk (avoids 413 from proxies)
 
 
@@ -393,7 +395,7 @@ async def upload_zip(auth_claims: dict[str, Any]):
         return jsonify({"message": "File must be a .zip archive", "status": "failed"}), 400
 
     try:
-        data = await file.read()
+        data = file.read()
         if len(data) > MAX_ZIP_SIZE_BYTES:
             return jsonify({
                 "message": f"Zip size exceeds limit of {MAX_ZIP_SIZE_BYTES // (1024*1024)} MB",
@@ -412,14 +414,20 @@ async def upload_zip(auth_claims: dict[str, Any]):
         errors = []
 
         with zipfile.ZipFile(io.BytesIO(data), "r") as zf:
-            members = [m for m in zf.namelist() if not m.endswith("/")]
+            members = [m for m in zf.infolist() if not m.is_dir()]
             if len(members) > MAX_ZIP_FILE_COUNT:
                 return jsonify({
                     "message": f"Zip contains too many files (max {MAX_ZIP_FILE_COUNT})",
                     "status": "failed",
                 }), 400
+            if sum(m.file_size for m in members) > MAX_ZIP_EXTRACTED_BYTES:
+                return jsonify({
+                    "message": f"Zip extracted size exceeds limit of {MAX_ZIP_EXTRACTED_BYTES // (1024*1024)} MB",
+                    "status": "failed",
+                }), 400
 
-            for i, name in enumerate(members):
+            for i, member in enumerate(members):
+                name = member.filename
                 # Normalize path and get flattened blob name (no subdirs for list_blobs compatibility)
                 rel_path = name.replace("\\", "/").lstrip("/")
                 ext = os.path.splitext(rel_path)[1].lower()
@@ -527,30 +535,40 @@ async def upload_zip_complete(auth_claims: dict[str, Any]):
 
     adls_manager: AdlsBlobManager = current_app.config[CONFIG_USER_BLOB_MANAGER]
     try:
-        data = await adls_manager.get_session_chunks(upload_id)
+        chunks = await adls_manager.list_session_chunks(upload_id)
     except Exception:
         current_app.logger.exception("Error reading session chunks for %s", upload_id)
         return jsonify({"message": "Invalid or expired upload_id", "status": "failed"}), 400
 
-    if not data:
+    if not chunks:
         return jsonify({"message": "Invalid or expired upload_id", "status": "failed"}), 400
 
-    if len(data) > MAX_ZIP_SIZE_BYTES:
+    # Validate from the chunk sizes and the central directory only, without downloading the archive body
+    reader = SessionChunksReader(adls_manager, chunks, asyncio.get_running_loop())
+    if reader.size > MAX_ZIP_SIZE_BYTES:
         return jsonify({
             "message": f"Zip size exceeds limit of {MAX_ZIP_SIZE_BYTES // (1024*1024)} MB",
             "status": "failed",
         }), 400
 
     try:
-        with zipfile.ZipFile(io.BytesIO(data), "r") as zf:
-            members = [m for m in zf.namelist() if not m.endswith("/")]
+        with await asyncio.to_thread(zipfile.ZipFile, reader, "r") as zf:
+            members = [m for m in zf.infolist() if not m.is_dir()]
             if len(members) > MAX_ZIP_FILE_COUNT:
                 return jsonify({
                     "message": f"Zip contains too many files (max {MAX_ZIP_FILE_COUNT})",
                     "status": "failed",
                 }), 400
+            if sum(m.file_size for m in members) > MAX_ZIP_EXTRACTED_BYTES:
+                return jsonify({
+                    "message": f"Zip extracted size exceeds limit of {MAX_ZIP_EXTRACTED_BYTES // (1024*1024)} MB",
+                    "status": "failed",
+                }), 400
     except zipfile.BadZipFile:
         return jsonify({"message": "Invalid or corrupted zip file", "status": "failed"}), 400
+    except Exception:
+        current_app.logger.exception("Error reading session chunks for %s", upload_id)
+        return jsonify({"message": "Invalid or expired upload_id", "status": "failed"}), 400
 
     user_oid = auth_claims["oid"]
     try:
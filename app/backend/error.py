@@ -1,4 +1,5 @@
 import logging
+from functools import singledispatch
 
 from azure.core.exceptions import HttpResponseError
 from openai import APIError
@@ -15,23 +16,45 @@ ERROR_MESSAGE_LENGTH = """Your message exceeded the context length limit for thi
 ERROR_MESSAGE_AZURE = """Azure service error: {message}
 If indexing is in progress, try again in a minute. Error type: {error_type}"""
 
+# Templates split around their placeholders once at import, so building a message is a plain concatenation
+ERROR_MESSAGE_PREFIX, ERROR_MESSAGE_SUFFIX = ERROR_MESSAGE.split("{error_type}")
+ERROR_MESSAGE_AZURE_PREFIX, ERROR_MESSAGE_AZURE_REST = ERROR_MESSAGE_AZURE.split("{message}")
+ERROR_MESSAGE_AZURE_INFIX, ERROR_MESSAGE_AZURE_SUFFIX = ERROR_MESSAGE_AZURE_REST.split("{error_type}")
 
+# OpenAI error codes that get their own message instead of the generic one
+API_ERROR_MESSAGES = {
+    "content_filter": ERROR_MESSAGE_FILTER,
+    "context_length_exceeded": ERROR_MESSAGE_LENGTH,
+}
+
+
+@singledispatch
 def error_dict(error: Exception) -> dict:
-    if isinstance(error, APIError) and error.code == "content_filter":
-        return {"error": ERROR_MESSAGE_FILTER}
-    if isinstance(error, APIError) and error.code == "context_length_exceeded":
-        return {"error": ERROR_MESSAGE_LENGTH}
-    if isinstance(error, HttpResponseError):
-        msg = getattr(error, "message", None) or str(error)
-        status = getattr(error.response, "status_code", None) if getattr(error, "response", None) else None
-        if status:
-            msg = f"[HTTP {status}] {msg}"
-        return {"error": ERROR_MESSAGE_AZURE.format(message=msg, error_type=type(error).__name__)}
-    return {"error": ERROR_MESSAGE.format(error_type=type(error))}
+    return {"error": f"{ERROR_MESSAGE_PREFIX}{type(error)}{ERROR_MESSAGE_SUFFIX}"}
+
+
+@error_dict.register
+def api_error_dict(error: APIError) -> dict:
+    message = API_ERROR_MESSAGES.get(getattr(error, "code", None))
+    if message:
+        return {"error": message}
+    return error_dict.dispatch(Exception)(error)
+
+
+@error_dict.register
+def azure_error_dict(error: HttpResponseError) -> dict:
+    msg = getattr(error, "message", None) or str(error)
+    status = getattr(error.response, "status_code", None) if getattr(error, "response", None) else None
+    if status:
+        msg = f"[HTTP {status}] {msg}"
+    return {
+        "error": f"{ERROR_MESSAGE_AZURE_PREFIX}{msg}{ERROR_MESSAGE_AZURE_INFIX}"
+        f"{type(error).__name__}{ERROR_MESSAGE_AZURE_SUFFIX}"
+    }
 
 
 def error_response(error: Exception, route: str, status_code: int = 500):
     logging.exception("Exception in %s: %s", route, error)
-    if isinstance(error, APIError) and error.code == "content_filter":
+    if isinstance(error, APIError) and getattr(error, "code", None) == "content_filter":
         status_code = 400
     return jsonify(error_dict(error)), status_code
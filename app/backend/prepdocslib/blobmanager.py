@@ -1,4 +1,7 @@
+import asyncio
+import bisect
 import io
+import itertools
 import json
 import logging
 import os
@@ -9,6 +12,7 @@ from urllib.parse import unquote
 
 from azure.core.credentials_async import AsyncTokenCredential
 from azure.core.exceptions import ResourceNotFoundError
+from azure.core.pipeline.transport import AsyncHttpTransport
 from azure.storage.blob.aio import BlobServiceClient
 from azure.storage.filedatalake.aio import (
     DataLakeDirectoryClient,
@@ -128,7 +132,17 @@ class AdlsBlobManager(BaseBlobManager):
     Images are stored in a separate images subdirectory for better organization.
     """
 
-    def __init__(self, endpoint: str, container: str, credential: AsyncTokenCredential):
+    # Files larger than one chunk are uploaded as several appends in parallel; smaller files stay a single request
+    UPLOAD_CHUNK_SIZE = 4 * 1024 * 1024  # 4 MB
+    UPLOAD_MAX_CONCURRENCY = 8
+
+    def __init__(
+        self,
+        endpoint: str,
+        container: str,
+        credential: AsyncTokenCredential,
+        transport: Optional[AsyncHttpTransport] = None,
+    ):
         """
         Initializes the AdlsBlobManager with the necessary parameters.
 
@@ -136,6 +150,7 @@ class AdlsBlobManager(BaseBlobManager):
             endpoint: The ADLS endpoint URL
             container: The name of the container (file system)
             credential: The credential for accessing ADLS
+            transport: Optional HTTP transport, e.g. to size the connection pool for concurrent uploads
         """
         self.endpoint = endpoint
         self.container = container
@@ -144,6 +159,7 @@ class AdlsBlobManager(BaseBlobManager):
             account_url=self.endpoint,
             file_system_name=self.container,
             credential=self.credential,
+            transport=transport,
         )
 
     async def close_clients(self):
@@ -198,7 +214,12 @@ class AdlsBlobManager(BaseBlobManager):
         # Ensure the file is at the beginning
         file_io.seek(0)
 
-        await file_client.upload_data(file_io, overwrite=True)
+        await file_client.upload_data(
+            file_io,
+            overwrite=True,
+            chunk_size=self.UPLOAD_CHUNK_SIZE,
+            max_concurrency=self.UPLOAD_MAX_CONCURRENCY,
+        )
 
         # Reset the file position for any subsequent reads
         file_io.seek(0)
@@ -395,24 +416,25 @@ class AdlsBlobManager(BaseBlobManager):
         file_client = self.file_system_client.get_file_client(path)
         await file_client.upload_data(io.BytesIO(data), overwrite=True)
 
-    async def get_session_chunks(self, upload_id: str) -> bytes:
-        """Download all chunks for a session, concatenate and return."""
+    async def list_session_chunks(self, upload_id: str) -> list[tuple[str, int]]:
+        """List the chunk paths for a session in upload order, paired with their sizes in bytes."""
         prefix = f"{self.SESSION_PATH_PREFIX}/{upload_id}/"
-        paths = []
+        chunks = []
         try:
             async for path in self.file_system_client.get_paths(path=prefix):
-                if path.is_directory:
+                if path.is_directory or "/chunk_" not in path.name:
                     continue
-                paths.append(path.name)
+                chunks.append((path.name, path.content_length or 0))
         except ResourceNotFoundError:
-            return b""
-        paths.sort(key=lambda p: int(p.split("chunk_")[1]))
-        data = b""
-        for p in paths:
-            file_client = self.file_system_client.get_file_client(p)
-            download_response = await file_client.download_file()
-            data += await download_response.readall()
-        return data
+            return []
+        chunks.sort(key=lambda chunk: int(chunk[0].split("chunk_")[1]))
+        return chunks
+
+    async def download_session_range(self, path: str, offset: int, length: int) -> bytes:
+        """Download length bytes starting at offset from a single session chunk (HTTP range request)."""
+        file_client = self.file_system_client.get_file_client(path)
+        download_response = await file_client.download_file(offset=offset, length=length)
+        return await download_response.readall()
 
     async def delete_session(self, upload_id: str, keep_progress: bool = False) -> None:
         """Delete all chunks and job for a session. If keep_progress, retain _progress.json for status polling."""
@@ -470,7 +492,7 @@ class AdlsBlobManager(BaseBlobManager):
             file_client = self.file_system_client.get_file_client(path)
             download_response = await file_client.download_file()
             data = await download_response.readall()
-            return json.loads(data.decode("utf-8"))
+            return json.loads(data)
         except ResourceNotFoundError:
             return None
 
@@ -485,6 +507,96 @@ class AdlsBlobManager(BaseBlobManager):
             return False
 
 
+class SessionChunksReader(io.RawIOBase):
+    """
+    Seekable, read-only file object over the chunk blobs of an upload session.
+
+    zipfile only reads the central directory and the entries it opens, so reads are served with
+    ranged downloads instead of assembling the whole archive in memory. Ranges loaded with
+    prefetch() are served from memory; other reads block on a download scheduled on the event
+    loop that owns the ADLS clients, so zipfile must be called from a worker thread.
+    """
+
+    def __init__(self, adls_manager: AdlsBlobManager, chunks: list[tuple[str, int]], loop: asyncio.AbstractEventLoop):
+        self.adls_manager = adls_manager
+        self.chunks = chunks
+        self.chunk_offsets = list(itertools.accumulate((size for _, size in chunks), initial=0))
+        self.size = self.chunk_offsets[-1]
+        self.position = 0
+        self.loop = loop
+        self.prefetched: dict[int, bytes] = {}
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self.position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self.position + offset
+        elif whence == io.SEEK_END:
+            position = self.size + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+        if position < 0:
+            raise ValueError(f"Negative seek position {position}")
+        self.position = position
+        return position
+
+    def read(self, size: int | None = -1) -> bytes:
+        # Return the range directly instead of RawIOBase's default of reading into a new
+        # bytearray and copying that into bytes, so each read makes a single copy
+        if size is None or size < 0:
+            size = self.size - self.position
+        length = min(size, self.size - self.position)
+        if length <= 0:
+            return b""
+        data = self.read_prefetched(self.position, length)
+        if data is None:
+            future = asyncio.run_coroutine_threadsafe(self.download_range(self.position, length), self.loop)
+            data = future.result()
+        self.position += len(data)
+        return data
+
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+    def read_prefetched(self, offset: int, length: int) -> bytes | None:
+        for start, data in list(self.prefetched.items()):
+            if start <= offset and offset + length <= start + len(data):
+                return data[offset - start : offset - start + length]
+        return None
+
+    async def download_range(self, offset: int, length: int) -> bytes:
+        """Download a byte range of the archive, spanning chunk boundaries as needed."""
+        end = min(offset + length, self.size)
+        index = bisect.bisect_right(self.chunk_offsets, offset) - 1
+        data = []
+        while offset < end:
+            path, _ = self.chunks[index]
+            chunk_start, chunk_end = self.chunk_offsets[index], self.chunk_offsets[index + 1]
+            take = min(end, chunk_end) - offset
+            if take > 0:
+                data.append(await self.adls_manager.download_session_range(path, offset - chunk_start, take))
+                offset += take
+            index += 1
+        return b"".join(data)
+
+    async def prefetch(self, offset: int, length: int) -> None:
+        self.prefetched[offset] = await self.download_range(offset, length)
+
+    def release(self, offset: int) -> None:
+        self.prefetched.pop(offset, None)
+
+
 class BlobManager(BaseBlobManager):
     """
     Class to manage uploading and deleting blobs containing citation information from a blob storage account
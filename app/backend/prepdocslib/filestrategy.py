@@ -180,8 +180,9 @@ class UploadUserFileStrategy:
         )
         self.search_field_name_embedding = search_field_name_embedding
 
-    async def add_file(self, file: File, user_oid: str):
-        sections = await parse_file(
+    async def prepare_sections(self, file: File, user_oid: str) -> list[Section]:
+        """Parse and split a file into sections without embedding or indexing them."""
+        return await parse_file(
             file,
             self.file_processors,
             None,
@@ -190,6 +191,14 @@ class UploadUserFileStrategy:
             figure_processor=self.figure_processor,
             user_oid=user_oid,
         )
+
+    async def index_sections(self, sections: list[Section]):
+        """Embed and index sections, which may come from several files (each File.url is used as storageUrl)."""
+        if sections:
+            await self.search_manager.update_content(sections)
+
+    async def add_file(self, file: File, user_oid: str):
+        sections = await self.prepare_sections(file, user_oid)
         if sections:
             await self.search_manager.update_content(sections, url=file.url)
 
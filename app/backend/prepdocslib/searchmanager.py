@@ -1,8 +1,9 @@
 import asyncio
 import logging
 import os
-from typing import Optional
+from typing import Any, Optional
 
+from azure.search.documents.aio import SearchClient
 from azure.search.documents.indexes.models import (
     AIServicesVisionParameters,
     AIServicesVisionVectorizer,
@@ -62,6 +63,101 @@ class Section:
         # this also needs images which will become the images field
 
 
+class SearchBatcher:
+    """
+    Collects documents and uploads them to a search index in as few requests as possible,
+    staying under the Azure AI Search limits of 1000 documents and 16 MB per indexing request.
+    Documents that fail with a transient status code are retried.
+    To learn more, please visit https://learn.microsoft.com/azure/search/search-how-to-load-search-index
+    """
+
+    MAX_BATCH_DOCUMENTS = 1000
+    MAX_BATCH_BYTES = 15_000_000
+    RETRY_STATUS_CODES = {409, 422, 429, 503}
+    MAX_ATTEMPTS = 3
+    # Longest JSON form of a float64 ("-1.2345678901234567e-05") plus its separator
+    FLOAT_JSON_BYTES = 24
+    # How json.dumps escapes quotes, backslashes and control characters, which code content is full of
+    JSON_ESCAPES = {
+        **{code: f"\\u{code:04x}" for code in range(0x20)},
+        ord('"'): '\\"',
+        ord("\\"): "\\\\",
+        ord("\b"): "\\b",
+        ord("\f"): "\\f",
+        ord("\n"): "\\n",
+        ord("\r"): "\\r",
+        ord("\t"): "\\t",
+    }
+
+    def __init__(self, search_client: SearchClient, index_name: str):
+        self.search_client = search_client
+        self.index_name = index_name
+        self.documents: list[dict] = []
+        self.size_bytes = 0
+        self.batch_count = 0
+
+    async def add(self, documents: list[dict]):
+        for document in documents:
+            document_bytes = self.estimate_size(document)
+            if self.documents and self.size_bytes + document_bytes > self.MAX_BATCH_BYTES:
+                await self.flush()
+            self.documents.append(document)
+            self.size_bytes += document_bytes
+            if len(self.documents) >= self.MAX_BATCH_DOCUMENTS:
+                await self.flush()
+
+    @classmethod
+    def estimate_size(cls, value: Any) -> int:
+        """
+        Upper bound on the JSON size of a document, without serializing it a second time.
+        Embedding vectors dominate, and they are sized from their length alone.
+        """
+        if isinstance(value, str):
+            # Non-ASCII characters may be escaped as \uXXXX
+            return len(value.translate(cls.JSON_ESCAPES)) + 2 if value.isascii() else 6 * len(value) + 2
+        if isinstance(value, dict):
+            return 2 + sum(cls.estimate_size(key) + cls.estimate_size(item) + 2 for key, item in value.items())
+        if isinstance(value, (list, tuple)):
+            if value and isinstance(value[0], float):
+                return 2 + len(value) * cls.FLOAT_JSON_BYTES
+            return 2 + sum(cls.estimate_size(item) + 1 for item in value)
+        return cls.FLOAT_JSON_BYTES
+
+    def drain(self) -> list[dict]:
+        documents = self.documents
+        self.documents = []
+        self.size_bytes = 0
+        return documents
+
+    async def flush(self):
+        documents = self.drain()
+        if not documents:
+            return
+        self.batch_count += 1
+        logger.info(
+            "Uploading batch %d with %d sections to search index '%s'",
+            self.batch_count,
+            len(documents),
+            self.index_name,
+        )
+        for attempt in range(1, self.MAX_ATTEMPTS + 1):
+            results = await self.search_client.upload_documents(documents)
+            failed = [result for result in results if not result.succeeded]
+            if not failed:
+                return
+            if attempt == self.MAX_ATTEMPTS or any(
+                result.status_code not in self.RETRY_STATUS_CODES for result in failed
+            ):
+                raise RuntimeError(
+                    f"Failed to index {len(failed)} sections in search index '{self.index_name}': "
+                    + "; ".join(f"{result.key} ({result.status_code}: {result.error_message})" for result in failed)
+                )
+            failed_keys = {result.key for result in failed}
+            documents = [document for document in documents if document["id"] in failed_keys]
+            logger.warning("Retrying %d sections that failed to index (attempt %d)", len(documents), attempt)
+            await asyncio.sleep(2**attempt)
+
+
 class SearchManager:
     """
     Class to manage a search service. It can create indexes, and update or remove sections stored in these indexes
@@ -626,11 +722,14 @@ class SearchManager:
     async def update_content(self, sections: list[Section], url: Optional[str] = None):
         MAX_BATCH_SIZE = 1000
         section_batches = [sections[i : i + MAX_BATCH_SIZE] for i in range(0, len(sections), MAX_BATCH_SIZE)]
+        # Sections from several files can be indexed together, so number them per file to keep ids stable
+        section_counts: dict[str, int] = {}
 
         async with self.search_info.create_search_client() as search_client:
-            for batch_index, batch in enumerate(section_batches):
+            batcher = SearchBatcher(search_client, self.search_info.index_name)
+            for batch in section_batches:
                 documents = []
-                for section_index, section in enumerate(batch):
+                for section in batch:
                     image_fields = {}
                     if self.search_images:
                         image_fields = {
@@ -648,8 +747,10 @@ class SearchManager:
                     file_id = section.content.filename_to_id()
                     # Use source_path (e.g. path inside zip) for display when set; else full_filename
                     index_path = getattr(section.content, "source_path", None) or full_filename
+                    section_number = section_counts.get(file_id, 0)
+                    section_counts[file_id] = section_number + 1
                     document = {
-                        "id": f"{file_id}-page-{section_index + batch_index * MAX_BATCH_SIZE}",
+                        "id": f"{file_id}-page-{section_number}",
                         "content": section.chunk.text,
                         "category": section.category,
                         "sourcepage": BlobManager.sourcepage_from_file_page(
@@ -662,10 +763,10 @@ class SearchManager:
                         **image_fields,
                         **section.content.acls,
                     }
+                    storage_url = url or section.content.url
+                    if storage_url:
+                        document["storageUrl"] = storage_url
                     documents.append(document)
-                if url:
-                    for document in documents:
-                        document["storageUrl"] = url
                 if self.embeddings:
                     if self.field_name_embedding is None:
                         raise ValueError("Embedding field name must be set")
@@ -674,13 +775,8 @@ class SearchManager:
                     )
                     for i, document in enumerate(documents):
                         document[self.field_name_embedding] = embeddings[i]
-                logger.info(
-                    "Uploading batch %d with %d sections to search index '%s'",
-                    batch_index + 1,
-                    len(documents),
-                    self.search_info.index_name,
-                )
-                await search_client.upload_documents(documents)
+                await batcher.add(documents)
+            await batcher.flush()
 
     async def remove_content(self, path: Optional[str] = None, only_oid: Optional[str] = None):
         logger.info(
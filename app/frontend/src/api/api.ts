@@ -97,6 +97,7 @@ export type UploadZipStatusResponse = {
     files_done?: number;
     pct_completion?: number;
     pct_indexing?: number;
+    /** Most recently indexed ids while processing, every indexed id once completed */
     indexed_ids?: string[];
 };
 
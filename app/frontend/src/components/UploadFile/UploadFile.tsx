@@ -256,7 +256,7 @@ export const UploadFile: React.FC<Props> = ({ className, disabled }: Props) => {
                                                 {uploadZipStatus.indexed_ids && uploadZipStatus.indexed_ids.length > 0 && (
                                                     <div style={{ marginTop: "4px", fontSize: "12px", maxHeight: "80px", overflow: "auto" }}>
                                                         Index IDs: {uploadZipStatus.indexed_ids.slice(-10).join(", ")}
-                                                        {uploadZipStatus.indexed_ids.length > 10 && ` (+${uploadZipStatus.indexed_ids.length - 10} more)`}
+                                                        {(uploadZipStatus.files_done ?? 0) > 10 && ` (+${(uploadZipStatus.files_done ?? 0) - 10} more)`}
                                                     </div>
                                                 )}
                                             </>
@@ -1,27 +1,40 @@
 """Azure Function: Zip Processor (codebase intelligence).
 
-Flow: frontend chunks the zip and uploads in parts → this function combines chunks
-into the full zip (get_session_chunks), extracts using the zip library (zipfile),
-then for each extracted file: chunks text, generates embeddings, and indexes into
-Azure AI Search so the model can use semantic search over the codebase (e.g. React app).
+Flow: frontend chunks the zip and uploads in parts → this function reads the zip directly
+from the uploaded chunks with ranged downloads (SessionChunksReader), extracts using the
+zip library (zipfile), chunks the text of each extracted file, then generates embeddings
+and indexes into Azure AI Search in batches spanning several files, so the model can use
+semantic search over the codebase (e.g. React app).
 No PDF or Document Intelligence; only text/code (TS, TSX, JS, JSX, CSS, JSON, MD, HTML).
 
 Triggered by blob creation: user-content/_sessions/{upload_id}/_job.json
 """
 
 import asyncio
+import collections
+import hashlib
 import io
 import json
 import logging
+import multiprocessing
 import os
+import threading
+import time
 import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
+import aiohttp
 import azure.functions as func
+from azure.core.pipeline.transport import AioHttpTransport
 from azure.identity.aio import ManagedIdentityCredential
 
-from prepdocslib.blobmanager import AdlsBlobManager
-from prepdocslib.filestrategy import UploadUserFileStrategy
+from prepdocslib.blobmanager import AdlsBlobManager, SessionChunksReader
+from prepdocslib.fileprocessor import FileProcessor
+from prepdocslib.filestrategy import UploadUserFileStrategy, parse_file
 from prepdocslib.listfilestrategy import File
+from prepdocslib.page import Chunk
+from prepdocslib.searchmanager import Section
 from prepdocslib.servicesetup import (
     OpenAIHost,
     build_file_processors,
@@ -39,13 +52,145 @@ logger = logging.getLogger(__name__)
 # Constants matching backend app.py
 MAX_ZIP_SIZE_BYTES = 50 * 1024 * 1024  # 50 MB
 MAX_ZIP_FILE_COUNT = 30000
+MAX_ZIP_EXTRACTED_BYTES = 500 * 1024 * 1024  # 500 MB
+# Entries that are not worth embedding even though their suffix is supported: oversized files,
+# lockfiles and minified bundles are generated rather than written, and waste embedding and indexing quota
+MAX_ZIP_ENTRY_BYTES = 512 * 1024  # 512 KB
+SKIPPED_FILENAMES = frozenset({"package-lock.json", "npm-shrinkwrap.json"})
+SKIPPED_SUFFIXES = (".min.js", ".min.css", ".min.mjs", ".bundle.js")
+BINARY_SNIFF_BYTES = 4096
+
+# Number of zip entries uploaded and indexed at the same time
+ZIP_PROCESS_CONCURRENCY = int(os.environ.get("ZIP_PROCESS_CONCURRENCY", "16"))
+# Pooled connections to the user storage account. Scales with ZIP_PROCESS_CONCURRENCY, since each
+# entry in flight holds one connection for its ranged download and then one for its upload, and the
+# rest cover progress writes, so concurrent entries reuse warm TLS connections instead of opening new ones
+ADLS_MAX_CONNECTIONS = 2 * ZIP_PROCESS_CONCURRENCY + 8
+# Worker processes that parse and split zip entries, so pure-Python chunking runs on several cores and
+# leaves the event loop free for downloads, uploads and indexing. Off (0, parse in the function's own process)
+# by default: each worker is a separate Python process that imports prepdocslib, about 130 MB of memory apiece,
+# so only enable it (e.g. 2-4) on hosts with memory to spare for large archives
+ZIP_SPLIT_WORKERS = int(os.environ.get("ZIP_SPLIT_WORKERS", "0"))
+# The progress blob is rewritten every N completed files or after this many seconds, whichever comes first
+PROGRESS_UPDATE_EVERY_N_FILES = 64
+PROGRESS_UPDATE_INTERVAL_SECONDS = 0.5
+# While processing, the progress blob carries only the most recently indexed ids (what the upload panel shows)
+# so each write stays the same size; the complete list is written once when the job completes
+PROGRESS_RECENT_IDS = 10
+# Sections from several files are embedded and indexed together once this many are buffered
+EMBEDDING_BATCH_SECTIONS = 256
+# Number of embedding + indexing batches in flight at the same time
+INDEXING_CONCURRENCY = 4
+# Extra bytes prefetched past an entry's compressed data, since its local header extra field
+# can be longer than the copy in the central directory
+ENTRY_PREFETCH_PADDING = 1024
+
+
+# Single managed identity credential shared by every client in the process, so all of them
+# reuse its in-memory token cache instead of each acquiring tokens separately
+azure_credential: ManagedIdentityCredential | None = None
+azure_credential_lock = threading.Lock()
+
+
+def looks_binary(head: bytes) -> bool:
+    """Text and code never contain NUL bytes, so a NUL near the start marks a binary (or UTF-16) file."""
+    return b"\x00" in head
+
+
+def get_azure_credential() -> ManagedIdentityCredential:
+    global azure_credential
+    if azure_credential is None:
+        with azure_credential_lock:
+            if azure_credential is None:
+                if AZURE_CLIENT_ID := os.environ.get("AZURE_CLIENT_ID"):
+                    azure_credential = ManagedIdentityCredential(client_id=AZURE_CLIENT_ID)
+                else:
+                    azure_credential = ManagedIdentityCredential()
+    return azure_credential
+
+
+# One event loop for every job, run in a background thread. The cached clients in get_settings()
+# keep their connection pools bound to the loop that first used them, so jobs must not each run
+# on a fresh asyncio.run() loop
+job_loop: asyncio.AbstractEventLoop | None = None
+job_loop_lock = threading.Lock()
+
+
+def get_job_loop() -> asyncio.AbstractEventLoop:
+    global job_loop
+    if job_loop is None:
+        with job_loop_lock:
+            if job_loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="zip-processor-loop", daemon=True).start()
+                job_loop = loop
+    return job_loop
+
+
+split_executor: ProcessPoolExecutor | None = None
+split_executor_lock = threading.Lock()
+
+
+def get_split_executor(file_processors: dict[str, FileProcessor]) -> ProcessPoolExecutor:
+    global split_executor
+    if split_executor is None:
+        with split_executor_lock:
+            if split_executor is None:
+                # Spawn rather than fork: the process already runs the job loop thread and open connections
+                split_executor = ProcessPoolExecutor(
+                    max_workers=ZIP_SPLIT_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=init_split_worker,
+                    initargs=(file_processors,),
+                )
+    return split_executor
+
+
+def reset_split_executor(broken: ProcessPoolExecutor) -> None:
+    """Drop a pool whose worker died, so the next get_split_executor() call builds a new one."""
+    global split_executor
+    with split_executor_lock:
+        if split_executor is broken:
+            split_executor = None
+    broken.shutdown(wait=False)
+
+
+# File processors of a split worker process, the ingester's own sent once when the worker starts,
+# so each entry only sends its extension, content and name and the worker supports the same extensions
+worker_file_processors: dict[str, FileProcessor] | None = None
+
+
+def init_split_worker(file_processors: dict[str, FileProcessor]) -> None:
+    global worker_file_processors
+    worker_file_processors = file_processors
+
+
+def split_entry(extension: str, raw: bytes, filename: str) -> list[Chunk]:
+    """Parse and split one zip entry in a worker process, returning only the picklable chunks."""
+    if worker_file_processors is None:
+        raise RuntimeError("split_entry must run in a worker started by get_split_executor()")
+    content = io.BytesIO(raw)
+    content.name = filename
+    file = File(content=content)
+    sections = asyncio.run(parse_file(file, {extension: worker_file_processors[extension]}))
+    return [section.chunk for section in sections]
+
+
+settings_cache: dict | None = None
+settings_lock = threading.Lock()
 
 
-def get_settings():
-    """Lazy-init settings from env (same as backend)."""
-    if hasattr(get_settings, "_settings"):
-        return get_settings._settings
+def get_settings() -> dict:
+    """Lazy-init settings from env (same as backend), once per process."""
+    global settings_cache
+    if settings_cache is None:
+        with settings_lock:
+            if settings_cache is None:
+                settings_cache = build_settings()
+    return settings_cache
 
+
+def build_settings() -> dict:
     AZURE_USERSTORAGE_ACCOUNT = os.environ.get("AZURE_USERSTORAGE_ACCOUNT")
     AZURE_USERSTORAGE_CONTAINER = os.environ.get("AZURE_USERSTORAGE_CONTAINER")
     AZURE_SEARCH_SERVICE = os.environ.get("AZURE_SEARCH_SERVICE")
@@ -62,10 +207,7 @@ def get_settings():
     AZURE_OPENAI_ENDPOINT = os.environ.get("AZURE_OPENAI_ENDPOINT")
     AZURE_VISION_ENDPOINT = os.environ.get("AZURE_VISION_ENDPOINT")
 
-    if AZURE_CLIENT_ID := os.environ.get("AZURE_CLIENT_ID"):
-        azure_credential = ManagedIdentityCredential(client_id=AZURE_CLIENT_ID)
-    else:
-        azure_credential = ManagedIdentityCredential()
+    azure_credential = get_azure_credential()
 
     openai_client, azure_openai_endpoint = setup_openai_client(
         openai_host=OPENAI_HOST,
@@ -77,10 +219,20 @@ def get_settings():
         openai_organization=os.environ.get("OPENAI_ORGANIZATION"),
     )
 
+    # Settings are cached for the process and jobs all run on one loop, so the session lives as long as the clients
+    adls_transport = AioHttpTransport(
+        session=aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=ADLS_MAX_CONNECTIONS, limit_per_host=ADLS_MAX_CONNECTIONS, ttl_dns_cache=300
+            )
+        ),
+        session_owner=False,
+    )
     user_blob_manager = AdlsBlobManager(
         endpoint=f"https://{AZURE_USERSTORAGE_ACCOUNT}.dfs.core.windows.net",
         container=AZURE_USERSTORAGE_CONTAINER,
         credential=azure_credential,
+        transport=adls_transport,
     )
 
     file_processors = build_file_processors(azure_credential=azure_credential)
@@ -132,11 +284,10 @@ def get_settings():
         figure_processor=figure_processor,
     )
 
-    get_settings._settings = {
+    return {
         "adls_manager": user_blob_manager,
         "ingester": ingester,
     }
-    return get_settings._settings
 
 
 async def process_zip_job(upload_id: str, filename: str, user_oid: str) -> None:
@@ -145,32 +296,50 @@ async def process_zip_job(upload_id: str, filename: str, user_oid: str) -> None:
     adls_manager: AdlsBlobManager = settings["adls_manager"]
     ingester: UploadUserFileStrategy = settings["ingester"]
 
-    data = await adls_manager.get_session_chunks(upload_id)
-    if not data:
+    chunks = await adls_manager.list_session_chunks(upload_id)
+    if not chunks:
         raise ValueError(f"No chunks found for session {upload_id}")
 
-    if len(data) > MAX_ZIP_SIZE_BYTES:
+    reader = SessionChunksReader(adls_manager, chunks, asyncio.get_running_loop())
+    if reader.size > MAX_ZIP_SIZE_BYTES:
         raise ValueError(f"Zip exceeds {MAX_ZIP_SIZE_BYTES // (1024*1024)} MB limit")
 
     zip_basename = filename.rsplit(".", 1)[0] if "." in filename else "archive"
-    supported_extensions = set(ingester.file_processors.keys())
+    # str.endswith with a tuple checks every suffix in one call, avoiding os.path.splitext per member
+    supported_suffixes = tuple(ingester.file_processors.keys())
 
-    with zipfile.ZipFile(io.BytesIO(data), "r") as zf:
-        members = [m for m in zf.namelist() if not m.endswith("/")]
+    # Opening the archive only downloads the end of central directory record and the central directory
+    zf = await asyncio.to_thread(zipfile.ZipFile, reader, "r")
+    with zf:
+        members = [info for info in zf.infolist() if not info.is_dir()]
         if len(members) > MAX_ZIP_FILE_COUNT:
             raise ValueError(f"Zip contains too many files (max {MAX_ZIP_FILE_COUNT})")
-
-        to_process = [
-            (name, rel_path, flattened)
-            for name in members
-            for rel_path in [name.replace("\\", "/").lstrip("/")]
-            for ext in [os.path.splitext(rel_path)[1].lower()]
-            if ext in supported_extensions
-            for flattened in [f"{zip_basename}__{rel_path.replace('/', '__')}"]
-        ]
+        if sum(info.file_size for info in members) > MAX_ZIP_EXTRACTED_BYTES:
+            raise ValueError(f"Zip extracts to more than {MAX_ZIP_EXTRACTED_BYTES // (1024*1024)} MB")
+
+        to_process = []
+        flattened_prefix = f"{zip_basename}__"
+        for info in members:
+            name = info.filename
+            # Separators never affect the suffix, so unsupported members are skipped before normalizing the path
+            if not name.lower().endswith(supported_suffixes):
+                continue
+            rel_path = (name.replace("\\", "/") if "\\" in name else name).lstrip("/")
+            # The suffix alone is not an extension: dotfiles such as "src/.ts" have none, and ".mjs" ends with ".js"
+            extension = os.path.splitext(rel_path)[1].lower()
+            if extension not in ingester.file_processors:
+                continue
+            if (
+                info.file_size > MAX_ZIP_ENTRY_BYTES
+                or rel_path.rsplit("/", 1)[-1].lower() in SKIPPED_FILENAMES
+                or rel_path.lower().endswith(SKIPPED_SUFFIXES)
+            ):
+                logger.info("Skipping %s from zip: generated file or over the size limit", rel_path)
+                continue
+            flattened = flattened_prefix + rel_path.replace("/", "__")
+            to_process.append((info, rel_path, flattened, extension))
         files_total = len(to_process)
         indexed_ids: list[str] = []
-        files_done = 0
 
         await adls_manager.upload_session_progress(
             upload_id=upload_id,
@@ -181,42 +350,182 @@ async def process_zip_job(upload_id: str, filename: str, user_oid: str) -> None:
             user_oid=user_oid,
         )
 
-        for name, rel_path, flattened in to_process:
+        # Copies of the same file (vendored code, licenses, generated typings) are embedded and indexed only once.
+        # While the first entry with some content is uploaded, split and indexed, its SHA-256 maps to the copies
+        # found meanwhile: they leave the total once it is indexed, and are processed again if it fails
+        seen_content: dict[bytes, list[tuple[zipfile.ZipInfo, str, str, str]]] = {}
+        indexed_content: set[bytes] = set()
+        # Entries are started from the queue as earlier ones finish, at most ZIP_PROCESS_CONCURRENCY at a time
+        queued = collections.deque(to_process)
+
+        def release_content(digest: bytes) -> None:
+            """Requeue the copies waiting on a first entry that failed, so the next one is processed in its place."""
+            queued.extend(seen_content.pop(digest))
+
+        async def process_one(
+            info: zipfile.ZipInfo, rel_path: str, flattened: str, extension: str
+        ) -> tuple[str, str, bytes | None, list[Section] | None]:
+            """Upload one zip entry to blob and split it into sections, with its content digest.
+
+            Sections are None when the entry fails or is skipped.
+            """
+            nonlocal files_total
+            owned_digest: bytes | None = None
             try:
-                raw = zf.read(name)
+                await reader.prefetch(
+                    info.header_offset,
+                    zipfile.sizeFileHeader
+                    + len(info.orig_filename.encode("utf-8"))
+                    + len(info.extra)
+                    + info.compress_size
+                    + ENTRY_PREFETCH_PADDING,
+                )
+                try:
+                    # zipfile still verifies each entry's CRC-32; zlib computes it in this worker thread
+                    # without holding the GIL, and it is the only check that the extracted bytes are intact
+                    raw = await asyncio.to_thread(zf.read, info)
+                finally:
+                    reader.release(info.header_offset)
+                if looks_binary(raw[:BINARY_SNIFF_BYTES]):
+                    logger.info("Skipping %s from zip: binary content", rel_path)
+                    # Skipped like the generated files above, so it leaves the total rather than never finishing
+                    files_total -= 1
+                    return rel_path, flattened, None, None
+                digest = hashlib.sha256(raw).digest()
+                if digest in indexed_content:
+                    logger.info("Skipping %s from zip: same content as an indexed entry", rel_path)
+                    files_total -= 1
+                    return rel_path, flattened, None, None
+                if digest in seen_content:
+                    seen_content[digest].append((info, rel_path, flattened, extension))
+                    return rel_path, flattened, None, None
+                seen_content[digest] = []
+                owned_digest = digest
                 content = io.BytesIO(raw)
                 content.name = flattened  # blob/key and stable id
                 file_url = await adls_manager.upload_blob(content, flattened, user_oid)
                 content.seek(0)
                 # Preserve folder structure in index (source_path → filepath in search)
-                await ingester.add_file(
-                    File(
-                        content=content,
-                        url=file_url,
-                        acls={"oids": [user_oid]},
-                        source_path=rel_path,
-                    ),
-                    user_oid=user_oid,
-                )
-                indexed_ids.append(flattened)
-                files_done += 1
-                await adls_manager.upload_session_progress(
-                    upload_id=upload_id,
-                    status="processing",
-                    files_total=files_total,
-                    files_done=files_done,
-                    indexed_ids=indexed_ids,
-                    user_oid=user_oid,
+                file = File(
+                    content=content,
+                    url=file_url,
+                    acls={"oids": [user_oid]},
+                    source_path=rel_path,
                 )
-                logger.info("Indexed %s (%d/%d)", rel_path, files_done, files_total)
+                if ZIP_SPLIT_WORKERS <= 0:
+                    return rel_path, flattened, digest, await ingester.prepare_sections(file, user_oid=user_oid)
+                executor = get_split_executor(ingester.file_processors)
+                try:
+                    chunks = await asyncio.get_running_loop().run_in_executor(
+                        executor, split_entry, extension, raw, flattened
+                    )
+                except BrokenProcessPool as e:
+                    # A dead worker (e.g. out of memory) breaks the whole pool, so replace it for later entries
+                    logger.warning("Split worker pool broke on %s, parsing it in process: %s", rel_path, e)
+                    reset_split_executor(executor)
+                    return rel_path, flattened, digest, await ingester.prepare_sections(file, user_oid=user_oid)
+                return rel_path, flattened, digest, [Section(chunk, content=file) for chunk in chunks]
             except Exception as e:
                 logger.exception("Error processing %s from zip: %s", rel_path, e)
+                if owned_digest is not None:
+                    release_content(owned_digest)
+                return rel_path, flattened, None, None
+
+        async def index_batch(sections: list[Section], files: list[tuple[str, str, bytes]]) -> None:
+            """Embed and index the sections of several files together, then mark those files as indexed.
+
+            If the batch fails, each file is indexed on its own, so one bad file does not fail the others.
+            """
+            nonlocal files_total
+            try:
+                await ingester.index_sections(sections)
+                indexed_files = files
+            except Exception as e:
+                logger.warning("Error indexing %d files from zip, indexing them one at a time: %s", len(files), e)
+                sections_by_path: dict[str, list[Section]] = {}
+                for section in sections:
+                    sections_by_path.setdefault(section.content.source_path, []).append(section)
+                indexed_files = []
+                for rel_path, flattened, digest in files:
+                    try:
+                        await ingester.index_sections(sections_by_path.get(rel_path, []))
+                    except Exception as file_error:
+                        logger.exception("Error indexing %s from zip: %s", rel_path, file_error)
+                        release_content(digest)
+                    else:
+                        indexed_files.append((rel_path, flattened, digest))
+            for rel_path, flattened, digest in indexed_files:
+                indexed_ids.append(flattened)
+                indexed_content.add(digest)
+                for _, duplicate_path, _, _ in seen_content.pop(digest):
+                    logger.info("Skipping %s from zip: same content as %s", duplicate_path, rel_path)
+                    files_total -= 1
+                logger.info("Indexed %s (%d/%d)", rel_path, len(indexed_ids), files_total)
+
+        indexing_tasks: set[asyncio.Task] = set()
+
+        async def start_index_batch(sections: list[Section], files: list[tuple[str, str, bytes]]) -> None:
+            """Start indexing a batch once fewer than INDEXING_CONCURRENCY batches are outstanding.
+
+            Until then the caller waits and no new entries are extracted, so when embedding is slower than
+            extraction, memory stays bounded by the entries and batches in flight rather than the whole archive.
+            """
+            while len(indexing_tasks) >= INDEXING_CONCURRENCY:
+                done, _ = await asyncio.wait(indexing_tasks, return_when=asyncio.FIRST_COMPLETED)
+                indexing_tasks.difference_update(done)
+            indexing_tasks.add(asyncio.create_task(index_batch(sections, files)))
+
+        in_flight: set[asyncio.Task] = set()
+        pending_sections: list[Section] = []
+        pending_files: list[tuple[str, str, bytes]] = []
+        last_progress_time = time.monotonic()
+        last_progress_count = 0
+        while queued or in_flight or pending_files or indexing_tasks:
+            while queued and len(in_flight) < ZIP_PROCESS_CONCURRENCY:
+                in_flight.add(asyncio.create_task(process_one(*queued.popleft())))
+            if in_flight:
+                done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for finished in done:
+                    rel_path, flattened, digest, sections = finished.result()
+                    if sections is None:
+                        continue
+                    pending_files.append((rel_path, flattened, digest))
+                    pending_sections.extend(sections)
+                    if len(pending_sections) >= EMBEDDING_BATCH_SECTIONS:
+                        await start_index_batch(pending_sections, pending_files)
+                        pending_sections, pending_files = [], []
+            else:
+                # Every queued entry is processed: index the last batch and wait for indexing to finish,
+                # since a failed batch requeues the copies of its files
+                if pending_files:
+                    await start_index_batch(pending_sections, pending_files)
+                    pending_sections, pending_files = [], []
+                done, _ = await asyncio.wait(indexing_tasks, return_when=asyncio.FIRST_COMPLETED)
+                indexing_tasks.difference_update(done)
+            now = time.monotonic()
+            if len(indexed_ids) > last_progress_count and (
+                len(indexed_ids) - last_progress_count >= PROGRESS_UPDATE_EVERY_N_FILES
+                or now - last_progress_time >= PROGRESS_UPDATE_INTERVAL_SECONDS
+            ):
+                last_progress_time = now
+                last_progress_count = len(indexed_ids)
+                try:
+                    await adls_manager.upload_session_progress(
+                        upload_id=upload_id,
+                        status="processing",
+                        files_total=files_total,
+                        files_done=len(indexed_ids),
+                        indexed_ids=indexed_ids[-PROGRESS_RECENT_IDS:],
+                        user_oid=user_oid,
+                    )
+                except Exception as e:
+                    logger.warning("Error updating progress for %s: %s", upload_id, e)
 
         await adls_manager.upload_session_progress(
             upload_id=upload_id,
             status="completed",
             files_total=files_total,
-            files_done=files_done,
+            files_done=len(indexed_ids),
             indexed_ids=indexed_ids,
             user_oid=user_oid,
         )
@@ -236,7 +545,7 @@ def zip_processor(blob: func.InputStream) -> None:
     parts = blob.name.replace("\\", "/").strip("/").split("/")
     upload_id = parts[-2] if len(parts) >= 2 else (parts[0] if parts else "unknown")
     try:
-        job = json.loads(blob.read().decode("utf-8"))
+        job = json.loads(blob.read())
     except Exception as e:
         logger.exception("Invalid _job.json for %s: %s", upload_id, e)
         return
@@ -250,7 +559,7 @@ def zip_processor(blob: func.InputStream) -> None:
     logger.info("Processing zip job %s for user %s", upload_id, user_oid)
 
     try:
-        asyncio.run(process_zip_job(upload_id, filename, user_oid))
+        asyncio.run_coroutine_threadsafe(process_zip_job(upload_id, filename, user_oid), get_job_loop()).result()
         logger.info("Completed zip job %s", upload_id)
     except Exception as e:
         logger.exception("Failed zip job %s: %s", upload_id, e)
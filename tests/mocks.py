@@ -1,5 +1,6 @@
 import json
 import os
+import zipfile
 from collections import namedtuple
 from io import BytesIO
 from typing import Optional
@@ -29,6 +30,7 @@ from azure.search.documents.knowledgebases.models import (
     KnowledgeBaseWebReference,
 )
 from azure.search.documents.models import (
+    IndexingResult,
     VectorQuery,
 )
 from azure.storage.blob import BlobProperties
@@ -127,6 +129,13 @@ class MockTransport(AsyncHttpTransport):
         pass  # pragma: no cover
 
 
+def mock_indexing_results(documents: list[dict], status_code: int = 201) -> list[IndexingResult]:
+    return [
+        IndexingResult.deserialize({"key": document["id"], "status": status_code < 300, "statusCode": status_code})
+        for document in documents
+    ]
+
+
 class MockAsyncPageIterator:
     def __init__(self, data):
         self.data = data
@@ -650,6 +659,36 @@ class MockSynthesisResult:
         return self.__result
 
 
+def build_zip(entries: dict[str, bytes]) -> bytes:
+    """Create an in-memory zip archive from a mapping of member name to content."""
+    buffer = BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, data in entries.items():
+            zf.writestr(name, data)
+    return buffer.getvalue()
+
+
+# Mock upload session chunks, served like AdlsBlobManager.list_session_chunks and download_session_range
+class MockSessionChunks:
+    def __init__(self, data: bytes, chunk_size: int = 1000):
+        self.chunks = {
+            f"_sessions/upload-1/chunk_{index:05d}": data[offset : offset + chunk_size]
+            for index, offset in enumerate(range(0, len(data), chunk_size))
+        }
+        self.downloads: list[tuple[str, int, int]] = []
+
+    @property
+    def downloaded_bytes(self) -> int:
+        return sum(length for _, _, length in self.downloads)
+
+    async def list_session_chunks(self, upload_id: str) -> list[tuple[str, int]]:
+        return [(path, len(data)) for path, data in self.chunks.items()]
+
+    async def download_session_range(self, path: str, offset: int, length: int) -> bytes:
+        self.downloads.append((path, offset, length))
+        return self.chunks[path][offset : offset + length]
+
+
 # Mock DirectoryClient used in blobmanager.py:AdlsBlobManager
 class MockDirectoryClient:
     async def get_directory_properties(self):
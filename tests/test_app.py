@@ -5,6 +5,7 @@ from unittest import mock
 
 import pytest
 import quart.testing.app
+from azure.core.exceptions import HttpResponseError
 from httpx import Request, Response
 from openai import BadRequestError
 from quart import Response as QuartResponse
@@ -253,6 +254,55 @@ async def test_chat_handle_exception_contentsafety(client, monkeypatch, snapshot
     snapshot.assert_match(json.dumps(result, indent=4), "result.json")
 
 
+@pytest.mark.asyncio
+async def test_chat_handle_exception_azure_error(client, monkeypatch):
+    monkeypatch.setattr(
+        "approaches.chatreadretrieveread.ChatReadRetrieveReadApproach.run",
+        mock.Mock(
+            side_effect=HttpResponseError(
+                message="The index 'gptkbindex' was not found.", response=mock.Mock(status_code=404, reason="Not Found")
+            )
+        ),
+    )
+
+    response = await client.post(
+        "/chat",
+        json={"messages": [{"content": "What is the capital of France?", "role": "user"}]},
+    )
+    assert response.status_code == 500
+    result = await response.get_json()
+    assert result["error"] == (
+        "Azure service error: [HTTP 404] The index 'gptkbindex' was not found.\n"
+        "If indexing is in progress, try again in a minute. Error type: HttpResponseError"
+    )
+
+
+@pytest.mark.asyncio
+async def test_chat_handle_exception_unknown_api_error_code(client, monkeypatch):
+    monkeypatch.setattr(
+        "approaches.chatreadretrieveread.ChatReadRetrieveReadApproach.run",
+        mock.Mock(
+            side_effect=BadRequestError(
+                message="Invalid value for 'temperature'",
+                body={"message": "Invalid value for 'temperature'", "code": "invalid_value", "status": 400},
+                response=fake_response(400),
+            )
+        ),
+    )
+
+    response = await client.post(
+        "/chat",
+        json={"messages": [{"content": "What is the capital of France?", "role": "user"}]},
+    )
+    assert response.status_code == 500
+    result = await response.get_json()
+    assert result["error"] == (
+        "The app encountered an error processing your request.\n"
+        "If you are an administrator of the app, check the application logs for a full traceback.\n"
+        "Error type: <class 'openai.BadRequestError'>\n"
+    )
+
+
 @pytest.mark.asyncio
 async def test_chat_handle_exception_streaming(client, monkeypatch, snapshot, caplog):
     chat_client = client.app.config[app.CONFIG_OPENAI_CLIENT]
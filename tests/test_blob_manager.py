@@ -1,3 +1,5 @@
+import asyncio
+import io
 import os
 import sys
 from tempfile import NamedTemporaryFile
@@ -6,12 +8,13 @@ from unittest.mock import MagicMock
 import azure.storage.blob.aio
 import azure.storage.filedatalake.aio
 import pytest
+from azure.core.pipeline.transport import AioHttpTransport
 
 # The pythonpath is configured in pyproject.toml to include app/backend
-from prepdocslib.blobmanager import AdlsBlobManager, BlobManager
+from prepdocslib.blobmanager import AdlsBlobManager, BlobManager, SessionChunksReader
 from prepdocslib.listfilestrategy import File
 
-from .mocks import MockAzureCredential
+from .mocks import MockAsyncPageIterator, MockAzureCredential, MockSessionChunks
 
 WINDOWS = sys.platform.startswith("win")
 
@@ -425,3 +428,68 @@ async def test_adls_download_blob_with_permission(
 
     assert content.startswith(b"\x89PNG\r\n\x1a\n")
     assert properties["content_settings"]["content_type"] == "application/octet-stream"
+
+
+@pytest.mark.asyncio
+async def test_adls_list_session_chunks(monkeypatch, adls_blob_manager):
+    """Session chunks are listed in upload order with their sizes, skipping job and progress blobs."""
+
+    def mock_get_paths(self, *args, **kwargs):
+        assert kwargs.get("path") == "_sessions/upload-1/"
+        return MockAsyncPageIterator(
+            [
+                azure.storage.filedatalake.PathProperties(name="_sessions/upload-1/chunk_00010", content_length=3),
+                azure.storage.filedatalake.PathProperties(name="_sessions/upload-1/_job.json", content_length=50),
+                azure.storage.filedatalake.PathProperties(name="_sessions/upload-1/chunk_00002", content_length=4),
+                azure.storage.filedatalake.PathProperties(name="_sessions/upload-1/_progress.json", content_length=90),
+            ]
+        )
+
+    monkeypatch.setattr(azure.storage.filedatalake.aio.FileSystemClient, "get_paths", mock_get_paths)
+
+    chunks = await adls_blob_manager.list_session_chunks("upload-1")
+
+    assert chunks == [("_sessions/upload-1/chunk_00002", 4), ("_sessions/upload-1/chunk_00010", 3)]
+
+
+@pytest.mark.asyncio
+async def test_session_chunks_reader(monkeypatch, adls_blob_manager):
+    """The reader presents the session chunks as one seekable file, preferring prefetched ranges."""
+    data = bytes(range(256)) * 10
+    session = MockSessionChunks(data)
+    downloads = session.downloads
+    chunks = await session.list_session_chunks("upload-1")
+    monkeypatch.setattr(adls_blob_manager, "download_session_range", session.download_session_range)
+    reader = SessionChunksReader(adls_blob_manager, chunks, asyncio.get_running_loop())
+
+    assert reader.size == 2560
+    reader.seek(990)
+    assert await asyncio.to_thread(reader.read, 20) == data[990:1010]
+    # The read spans two chunks, so it is served by one ranged download from each
+    assert downloads == [("_sessions/upload-1/chunk_00000", 990, 10), ("_sessions/upload-1/chunk_00001", 0, 10)]
+    assert reader.tell() == 1010
+    reader.seek(-10, io.SEEK_END)
+    assert await asyncio.to_thread(reader.read) == data[-10:]
+    assert await asyncio.to_thread(reader.read, 5) == b""
+
+    await reader.prefetch(1500, 100)
+    downloads.clear()
+    reader.seek(1510)
+    buffer = bytearray(50)
+    assert await asyncio.to_thread(reader.readinto, buffer) == 50
+    assert bytes(buffer) == data[1510:1560]
+    assert downloads == []
+    reader.release(1500)
+    assert reader.prefetched == {}
+
+
+def test_adls_blob_manager_uses_given_transport():
+    transport = AioHttpTransport()
+    adls_blob_manager = AdlsBlobManager(
+        endpoint="https://test-storage-account.dfs.core.windows.net",
+        container="test-storage-container",
+        credential=MockAzureCredential(),
+        transport=transport,
+    )
+
+    assert adls_blob_manager.file_system_client._pipeline._transport is transport
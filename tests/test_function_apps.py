@@ -1,9 +1,13 @@
+import asyncio
 import base64
 import json
 import logging
 import os
 from collections.abc import Iterable
+from concurrent.futures import Executor
+from concurrent.futures.process import BrokenProcessPool
 from dataclasses import dataclass, field
+from types import SimpleNamespace
 from typing import Any
 
 import azure.functions as func
@@ -12,10 +16,13 @@ import pytest
 from document_extractor import function_app as document_extractor
 from figure_processor import function_app as figure_processor
 from prepdocslib.fileprocessor import FileProcessor
+from prepdocslib.filestrategy import parse_file
+from prepdocslib.searchmanager import Section
 from prepdocslib.textparser import TextParser
 from prepdocslib.textsplitter import SentenceTextSplitter
-from tests.mocks import TEST_PNG_BYTES
+from tests.mocks import TEST_PNG_BYTES, MockSessionChunks, build_zip
 from text_processor import function_app as text_processor
+from zip_processor import function_app as zip_processor
 
 
 @dataclass
@@ -1573,3 +1580,320 @@ def test_text_processor_module_init_logs_warning(
 
     importlib.reload(reloaded)
     reloaded.settings = None
+
+
+class MockZipAdlsManager(MockSessionChunks):
+    def __init__(self, zip_bytes: bytes) -> None:
+        super().__init__(zip_bytes)
+        self.uploaded: dict[str, bytes] = {}
+        self.progress: list[dict[str, Any]] = []
+        self.deleted_sessions: list[str] = []
+
+    async def upload_blob(self, file: Any, filename: str, user_oid: str) -> str:
+        self.uploaded[filename] = file.read()
+        return f"https://account.dfs.core.windows.net/container/{user_oid}/{filename}"
+
+    async def upload_session_progress(self, **kwargs: Any) -> None:
+        self.progress.append({**kwargs, "indexed_ids": list(kwargs["indexed_ids"])})
+
+    async def delete_session(self, upload_id: str, keep_progress: bool = False) -> None:
+        self.deleted_sessions.append(upload_id)
+
+
+class MockZipIngester:
+    def __init__(self) -> None:
+        self.file_processors = {
+            ".ts": FileProcessor(TextParser(), SentenceTextSplitter()),
+            ".md": FileProcessor(TextParser(), SentenceTextSplitter()),
+            ".js": FileProcessor(TextParser(), SentenceTextSplitter()),
+            ".json": FileProcessor(TextParser(), SentenceTextSplitter()),
+        }
+        self.added: list[Any] = []
+        self.sections: list[Any] = []
+        self.index_calls = 0
+
+    async def prepare_sections(self, file: Any, user_oid: str) -> list[Any]:
+        return await parse_file(file, self.file_processors)
+
+    async def index_sections(self, sections: list[Any]) -> None:
+        self.index_calls += 1
+        self.sections.extend(sections)
+        self.added.extend({id(section.content): section.content for section in sections}.values())
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("split_workers", [0, 2])
+async def test_zip_processor_indexes_supported_files(monkeypatch: pytest.MonkeyPatch, split_workers: int) -> None:
+    """Zip processor uploads supported entries concurrently, indexes them in batches and records final progress."""
+    entries = {f"src/file{i}.ts": f"export const x{i} = {i};".encode() for i in range(40)}
+    entries["README.md"] = b"# Readme"
+    entries["docs\\guide.md"] = b"# Guide"
+    entries["image.png"] = os.urandom(200_000)
+    entries["src/broken.ts"] = b"\xff\xfe not utf-8"
+    entries["src/.ts"] = b"export {};"
+    # Ends with the supported ".js" suffix, but its extension has no processor in this ingester
+    entries["src/module.mjs"] = b"export {};"
+    adls_manager = MockZipAdlsManager(build_zip(entries))
+    ingester = MockZipIngester()
+    monkeypatch.setattr(zip_processor, "get_settings", lambda: {"adls_manager": adls_manager, "ingester": ingester})
+    monkeypatch.setattr(zip_processor, "ZIP_PROCESS_CONCURRENCY", 4)
+    monkeypatch.setattr(zip_processor, "EMBEDDING_BATCH_SECTIONS", 10)
+    monkeypatch.setattr(zip_processor, "ZIP_SPLIT_WORKERS", split_workers)
+    # The real spawn-context pool, whose workers receive the ingester's file processors on startup
+    monkeypatch.setattr(zip_processor, "split_executor", None)
+
+    try:
+        await zip_processor.process_zip_job("upload-1", "myapp.zip", "user-oid")
+    finally:
+        if zip_processor.split_executor:
+            zip_processor.split_executor.shutdown()
+
+    assert (zip_processor.split_executor is not None) == bool(split_workers)
+
+    assert adls_manager.uploaded["myapp__src__file7.ts"] == b"export const x7 = 7;"
+    assert "myapp__image.png" not in adls_manager.uploaded
+    assert "myapp__src__.ts" not in adls_manager.uploaded
+    assert "myapp__src__module.mjs" not in adls_manager.uploaded
+    assert adls_manager.uploaded["myapp__docs__guide.md"] == b"# Guide"
+    assert {file.source_path for file in ingester.added} == {f"src/file{i}.ts" for i in range(40)} | {
+        "README.md",
+        "docs/guide.md",
+    }
+    # One section per file, 10 sections per batch
+    assert ingester.index_calls == 5
+    assert all(isinstance(section, Section) for section in ingester.sections)
+    final = adls_manager.progress[-1]
+    assert final["status"] == "completed"
+    assert final["files_total"] == 43
+    assert final["files_done"] == 42
+    assert sorted(final["indexed_ids"]) == sorted(
+        [f"myapp__src__file{i}.ts" for i in range(40)] + ["myapp__README.md", "myapp__docs__guide.md"]
+    )
+    # Intermediate progress writes are rate-limited rather than issued per file, and only carry recent ids
+    assert len(adls_manager.progress) < 41
+    assert all(len(progress["indexed_ids"]) <= 10 for progress in adls_manager.progress[:-1])
+    assert adls_manager.deleted_sessions == ["upload-1"]
+    # The large unsupported entry is never downloaded
+    assert adls_manager.downloaded_bytes < sum(len(data) for data in adls_manager.chunks.values())
+
+
+class BrokenSplitExecutor(Executor):
+    def submit(self, fn: Any, /, *args: Any, **kwargs: Any) -> Any:
+        raise BrokenProcessPool("A child process terminated abruptly")
+
+
+@pytest.mark.asyncio
+async def test_zip_processor_replaces_broken_split_pool(monkeypatch: pytest.MonkeyPatch) -> None:
+    """A split pool broken by a dead worker is dropped, and the entry is parsed in process instead."""
+    adls_manager = MockZipAdlsManager(build_zip({"src/app.ts": b"export const app = 1;"}))
+    ingester = MockZipIngester()
+    monkeypatch.setattr(zip_processor, "get_settings", lambda: {"adls_manager": adls_manager, "ingester": ingester})
+    monkeypatch.setattr(zip_processor, "ZIP_SPLIT_WORKERS", 2)
+    monkeypatch.setattr(zip_processor, "split_executor", BrokenSplitExecutor())
+
+    await zip_processor.process_zip_job("upload-1", "myapp.zip", "user-oid")
+
+    assert zip_processor.split_executor is None
+    assert [file.source_path for file in ingester.added] == ["src/app.ts"]
+    final = adls_manager.progress[-1]
+    assert final["files_total"] == 1
+    assert final["files_done"] == 1
+
+
+@pytest.mark.asyncio
+async def test_zip_processor_indexes_files_alone_when_batch_fails(monkeypatch: pytest.MonkeyPatch) -> None:
+    """One file that cannot be indexed fails on its own instead of taking the rest of its batch with it."""
+    entries = {f"src/file{i}.ts": f"export const x{i} = {i};".encode() for i in range(20)}
+    entries["src/bad.ts"] = b"export const bad = true;"
+    adls_manager = MockZipAdlsManager(build_zip(entries))
+    ingester = MockZipIngester()
+    index_sections = ingester.index_sections
+    batch_sizes: list[int] = []
+
+    async def failing_index_sections(sections: list[Any]) -> None:
+        batch_sizes.append(len(sections))
+        if any(section.content.source_path == "src/bad.ts" for section in sections):
+            raise RuntimeError("indexing failed")
+        await index_sections(sections)
+
+    monkeypatch.setattr(ingester, "index_sections", failing_index_sections)
+    monkeypatch.setattr(zip_processor, "get_settings", lambda: {"adls_manager": adls_manager, "ingester": ingester})
+    monkeypatch.setattr(zip_processor, "ZIP_SPLIT_WORKERS", 0)
+
+    await zip_processor.process_zip_job("upload-1", "myapp.zip", "user-oid")
+
+    # The whole batch is tried first, then each of its files alone
+    assert batch_sizes == [21] + [1] * 21
+    assert {file.source_path for file in ingester.added} == {f"src/file{i}.ts" for i in range(20)}
+    final = adls_manager.progress[-1]
+    assert final["status"] == "completed"
+    assert final["files_total"] == 21
+    assert final["files_done"] == 20
+    assert "myapp__src__bad.ts" not in final["indexed_ids"]
+
+
+@pytest.mark.asyncio
+async def test_zip_processor_applies_backpressure_from_indexing(monkeypatch: pytest.MonkeyPatch) -> None:
+    """When indexing is slower than extraction, extraction waits instead of buffering the whole archive."""
+    entries = {f"src/file{i}.ts": f"export const x{i} = {i};".encode() for i in range(120)}
+    adls_manager = MockZipAdlsManager(build_zip(entries))
+    ingester = MockZipIngester()
+    live_batches: list[int] = []
+    live_entries: list[int] = []
+
+    async def slow_index_sections(sections: list[Any]) -> None:
+        running = [task.get_coro().__name__ for task in asyncio.all_tasks()]
+        live_batches.append(running.count("index_batch"))
+        live_entries.append(running.count("process_one"))
+        await asyncio.sleep(0.01)
+        ingester.added.extend(section.content for section in sections)
+
+    monkeypatch.setattr(ingester, "index_sections", slow_index_sections)
+    monkeypatch.setattr(zip_processor, "get_settings", lambda: {"adls_manager": adls_manager, "ingester": ingester})
+    monkeypatch.setattr(zip_processor, "ZIP_PROCESS_CONCURRENCY", 4)
+    monkeypatch.setattr(zip_processor, "EMBEDDING_BATCH_SECTIONS", 5)
+    monkeypatch.setattr(zip_processor, "INDEXING_CONCURRENCY", 2)
+    monkeypatch.setattr(zip_processor, "ZIP_SPLIT_WORKERS", 0)
+
+    await zip_processor.process_zip_job("upload-1", "myapp.zip", "user-oid")
+
+    assert len(ingester.added) == 120
+    assert len(live_batches) == 24
+    assert max(live_batches) <= 2
+    assert max(live_entries) <= 4
+
+
+@pytest.mark.asyncio
+async def test_zip_processor_rejects_oversized_extraction(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Entry sizes from the central directory are checked before any entry is downloaded."""
+    entries = {f"src/file{i}.ts": b"a" * 10_000 for i in range(5)}
+    adls_manager = MockZipAdlsManager(build_zip(entries))
+    ingester = MockZipIngester()
+    monkeypatch.setattr(zip_processor, "get_settings", lambda: {"adls_manager": adls_manager, "ingester": ingester})
+    monkeypatch.setattr(zip_processor, "MAX_ZIP_EXTRACTED_BYTES", 40_000)
+
+    with pytest.raises(ValueError, match="Zip extracts to more than"):
+        await zip_processor.process_zip_job("upload-1", "myapp.zip", "user-oid")
+
+    assert adls_manager.uploaded == {}
+    assert adls_manager.progress == []
+    assert adls_manager.downloaded_bytes < sum(len(data) for data in adls_manager.chunks.values())
+
+
+@pytest.mark.asyncio
+async def test_zip_processor_skips_generated_binary_and_duplicate_files(monkeypatch: pytest.MonkeyPatch) -> None:
+    entries = {
+        "src/app.ts": b"export const app = 1;",
+        "package-lock.json": b'{"lockfileVersion": 3}',
+        "dist/bundle.min.js": b"var a=1;",
+        "src/huge.ts": b"a" * (600 * 1024),
+        "src/utf16.ts": "export const a = 1;".encode("utf-16"),
+        "vendor/app.ts": b"export const app = 1;",
+    }
+    adls_manager = MockZipAdlsManager(build_zip(entries))
+    ingester = MockZipIngester()
+    monkeypatch.setattr(zip_processor, "get_settings", lambda: {"adls_manager": adls_manager, "ingester": ingester})
+    monkeypatch.setattr(zip_processor, "ZIP_SPLIT_WORKERS", 0)
+
+    await zip_processor.process_zip_job("upload-1", "myapp.zip", "user-oid")
+
+    # Only one of the two identical copies is uploaded and indexed
+    assert len(adls_manager.uploaded) == 1
+    assert set(adls_manager.uploaded) <= {"myapp__src__app.ts", "myapp__vendor__app.ts"}
+    assert len(ingester.added) == 1
+    final = adls_manager.progress[-1]
+    # The binary entry and the second copy are only found once extracted, and then leave the total
+    assert adls_manager.progress[0]["files_total"] == 3
+    assert final["files_total"] == 1
+    assert final["files_done"] == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("failing_step", ["upload", "index"])
+async def test_zip_processor_indexes_copy_when_first_copy_fails(
+    monkeypatch: pytest.MonkeyPatch, failing_step: str
+) -> None:
+    """A copy skipped as a duplicate is processed in place of the first copy when that one fails."""
+    entries = {f"{folder}/app.ts": b"export const app = 1;" for folder in ("src", "vendor", "lib")}
+    adls_manager = MockZipAdlsManager(build_zip(entries))
+    ingester = MockZipIngester()
+    failed: list[str] = []
+
+    if failing_step == "upload":
+        upload_blob = adls_manager.upload_blob
+
+        async def failing_upload_blob(file: Any, filename: str, user_oid: str) -> str:
+            if not failed:
+                failed.append(filename)
+                raise RuntimeError("upload failed")
+            return await upload_blob(file, filename, user_oid)
+
+        monkeypatch.setattr(adls_manager, "upload_blob", failing_upload_blob)
+    else:
+        index_sections = ingester.index_sections
+
+        async def failing_index_sections(sections: list[Any]) -> None:
+            if not failed:
+                failed.extend(section.content.source_path for section in sections)
+            if any(section.content.source_path in failed for section in sections):
+                raise RuntimeError("indexing failed")
+            await index_sections(sections)
+
+        monkeypatch.setattr(ingester, "index_sections", failing_index_sections)
+    monkeypatch.setattr(zip_processor, "get_settings", lambda: {"adls_manager": adls_manager, "ingester": ingester})
+    monkeypatch.setattr(zip_processor, "ZIP_SPLIT_WORKERS", 0)
+
+    await zip_processor.process_zip_job("upload-1", "myapp.zip", "user-oid")
+
+    assert len(failed) == 1
+    assert len(ingester.added) == 1
+    final = adls_manager.progress[-1]
+    assert final["status"] == "completed"
+    # The failed copy stays in the total without being done; the copy left over after indexing is skipped
+    assert final["files_total"] == 2
+    assert final["files_done"] == 1
+
+
+def test_zip_processor_builds_settings_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    builds = []
+
+    def mock_build_settings() -> dict:
+        builds.append(1)
+        return {"adls_manager": object()}
+
+    monkeypatch.setattr(zip_processor, "settings_cache", None)
+    monkeypatch.setattr(zip_processor, "build_settings", mock_build_settings)
+
+    settings = zip_processor.get_settings()
+
+    assert zip_processor.get_settings() is settings
+    assert len(builds) == 1
+
+
+def test_zip_processor_shares_managed_identity_credential(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(zip_processor, "azure_credential", None)
+    monkeypatch.setenv("AZURE_CLIENT_ID", "client-123")
+
+    credential = zip_processor.get_azure_credential()
+
+    assert isinstance(credential, zip_processor.ManagedIdentityCredential)
+    assert zip_processor.get_azure_credential() is credential
+
+
+def test_zip_processor_runs_jobs_on_one_event_loop(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Jobs share a long-lived loop so cached async clients keep working across invocations."""
+    loops = []
+
+    async def mock_process_zip_job(upload_id: str, filename: str, user_oid: str) -> None:
+        loops.append(asyncio.get_running_loop())
+
+    monkeypatch.setattr(zip_processor, "process_zip_job", mock_process_zip_job)
+    job = json.dumps({"filename": "myapp.zip", "user_oid": "user-oid"}).encode("utf-8")
+    for upload_id in ["upload-1", "upload-2"]:
+        blob = SimpleNamespace(name=f"user-content/_sessions/{upload_id}/_job.json", read=lambda: job)
+        zip_processor.zip_processor(blob)
+
+    assert len(loops) == 2
+    assert loops[0] is loops[1]
+    assert loops[0] is zip_processor.get_job_loop()
+    assert loops[0].is_running()
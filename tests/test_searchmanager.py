@@ -1,4 +1,5 @@
 import io
+import json
 
 import openai
 import openai.types
@@ -19,7 +20,7 @@ from openai.types.create_embedding_response import Usage
 from prepdocslib.embeddings import OpenAIEmbeddings
 from prepdocslib.listfilestrategy import File
 from prepdocslib.page import ImageOnPage
-from prepdocslib.searchmanager import SearchManager, Section
+from prepdocslib.searchmanager import SearchBatcher, SearchManager, Section
 from prepdocslib.strategy import SearchInfo
 from prepdocslib.textsplitter import Chunk
 
@@ -28,6 +29,7 @@ from .mocks import (
     MOCK_EMBEDDING_MODEL_NAME,
     MockClient,
     MockEmbeddingsClient,
+    mock_indexing_results,
 )
 
 
@@ -518,6 +520,7 @@ async def test_update_content(monkeypatch, search_info):
         assert documents[0]["category"] == "test"
         assert documents[0]["sourcepage"] == "foo.pdf#page=1"
         assert documents[0]["sourcefile"] == "foo.pdf"
+        return mock_indexing_results(documents)
 
     monkeypatch.setattr(SearchClient, "upload_documents", mock_upload_documents)
 
@@ -547,6 +550,7 @@ async def test_update_content_many(monkeypatch, search_info):
 
     async def mock_upload_documents(self, documents):
         ids.extend([doc["id"] for doc in documents])
+        return mock_indexing_results(documents)
 
     monkeypatch.setattr(SearchClient, "upload_documents", mock_upload_documents)
 
@@ -576,6 +580,116 @@ async def test_update_content_many(monkeypatch, search_info):
     assert len(set(ids)) == 1500, "Document ids are not unique"
 
 
+@pytest.mark.asyncio
+async def test_update_content_multiple_files(monkeypatch, search_info):
+    documents_uploaded = []
+
+    async def mock_upload_documents(self, documents):
+        documents_uploaded.extend(documents)
+        return mock_indexing_results(documents)
+
+    monkeypatch.setattr(SearchClient, "upload_documents", mock_upload_documents)
+
+    manager = SearchManager(search_info)
+
+    sections = []
+    for name in ["foo.md", "bar.md"]:
+        test_io = io.BytesIO(b"test content")
+        test_io.name = f"test/{name}"
+        file = File(test_io, url=f"https://test.blob.core.windows.net/content/{name}")
+        sections.extend(Section(chunk=Chunk(page_num=0, text=f"section {i}"), content=file) for i in range(2))
+
+    await manager.update_content(sections)
+
+    # Sections are numbered per file and take their storage URL from their own file
+    assert [doc["id"] for doc in documents_uploaded] == [
+        "file-foo_md-666F6F2E6D64-page-0",
+        "file-foo_md-666F6F2E6D64-page-1",
+        "file-bar_md-6261722E6D64-page-0",
+        "file-bar_md-6261722E6D64-page-1",
+    ]
+    assert [doc["storageUrl"] for doc in documents_uploaded] == [
+        "https://test.blob.core.windows.net/content/foo.md",
+        "https://test.blob.core.windows.net/content/foo.md",
+        "https://test.blob.core.windows.net/content/bar.md",
+        "https://test.blob.core.windows.net/content/bar.md",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_search_batcher_splits_by_size(monkeypatch, search_info):
+    batches = []
+
+    async def mock_upload_documents(self, documents):
+        batches.append([doc["id"] for doc in documents])
+        return mock_indexing_results(documents)
+
+    monkeypatch.setattr(SearchClient, "upload_documents", mock_upload_documents)
+    monkeypatch.setattr(SearchBatcher, "MAX_BATCH_BYTES", 300)
+
+    batcher = SearchBatcher(search_info.create_search_client(), search_info.index_name)
+    await batcher.add([{"id": f"doc-{i}", "content": "x" * 100} for i in range(5)])
+    await batcher.flush()
+
+    assert batches == [["doc-0", "doc-1"], ["doc-2", "doc-3"], ["doc-4"]]
+
+
+def test_search_batcher_estimate_size_bounds_json_size():
+    document = {
+        "id": "file-page-0",
+        "content": "Überblick über die Komponenten 日本語",
+        "embedding": [-1.2345678901234567e-05, 0.1, -0.000123456789] * 1024,
+        "oids": ["oid-1"],
+        "images": [{"url": "https://example.com/a.png", "boundingbox": [1.5, 2.5, 3.5, 4.5], "embedding": [0.5] * 8}],
+        "category": None,
+    }
+
+    estimate = SearchBatcher.estimate_size(document)
+
+    assert estimate >= len(json.dumps(document))
+    assert estimate < 2 * len(json.dumps(document))
+
+    # Code is full of quotes, backslashes and newlines, which JSON escapes
+    code_document = {"content": 'const a = "b";\n\tpath = "C:\\src";\x00\n' * 100}
+    assert SearchBatcher.estimate_size(code_document) >= len(json.dumps(code_document))
+
+
+@pytest.mark.asyncio
+async def test_search_batcher_retries_failed_documents(monkeypatch, search_info):
+    batches = []
+
+    async def mock_upload_documents(self, documents):
+        batches.append([doc["id"] for doc in documents])
+        if len(batches) == 1:
+            return mock_indexing_results(documents[:1]) + mock_indexing_results(documents[1:], status_code=503)
+        return mock_indexing_results(documents)
+
+    async def mock_sleep(seconds):
+        pass
+
+    monkeypatch.setattr(SearchClient, "upload_documents", mock_upload_documents)
+    monkeypatch.setattr("prepdocslib.searchmanager.asyncio.sleep", mock_sleep)
+
+    batcher = SearchBatcher(search_info.create_search_client(), search_info.index_name)
+    await batcher.add([{"id": f"doc-{i}"} for i in range(3)])
+    await batcher.flush()
+
+    assert batches == [["doc-0", "doc-1", "doc-2"], ["doc-1", "doc-2"]]
+
+
+@pytest.mark.asyncio
+async def test_search_batcher_raises_on_permanent_failure(monkeypatch, search_info):
+    async def mock_upload_documents(self, documents):
+        return mock_indexing_results(documents, status_code=400)
+
+    monkeypatch.setattr(SearchClient, "upload_documents", mock_upload_documents)
+
+    batcher = SearchBatcher(search_info.create_search_client(), search_info.index_name)
+    await batcher.add([{"id": "doc-0"}])
+    with pytest.raises(RuntimeError, match="Failed to index 1 sections"):
+        await batcher.flush()
+
+
 @pytest.mark.asyncio
 async def test_update_content_with_embeddings(monkeypatch, search_info):
     response = openai.types.CreateEmbeddingResponse(
@@ -599,6 +713,7 @@ async def test_update_content_with_embeddings(monkeypatch, search_info):
 
     async def mock_upload_documents(self, documents):
         documents_uploaded.extend(documents)
+        return mock_indexing_results(documents)
 
     monkeypatch.setattr(SearchClient, "upload_documents", mock_upload_documents)
     embeddings = OpenAIEmbeddings(
@@ -648,6 +763,7 @@ async def test_update_content_no_images_when_disabled(monkeypatch, search_info):
 
     async def mock_upload_documents(self, documents):
         documents_uploaded.extend(documents)
+        return mock_indexing_results(documents)
 
     monkeypatch.setattr(SearchClient, "upload_documents", mock_upload_documents)
 
@@ -677,6 +793,7 @@ async def test_update_content_with_images_when_enabled(monkeypatch, search_info)
 
     async def mock_upload_documents(self, documents):
         documents_uploaded.extend(documents)
+        return mock_indexing_results(documents)
 
     monkeypatch.setattr(SearchClient, "upload_documents", mock_upload_documents)
 
@@ -1,3 +1,4 @@
+import os
 from io import BytesIO
 
 import azure.core.exceptions
@@ -8,8 +9,11 @@ from azure.search.documents.aio import SearchClient
 from azure.storage.filedatalake.aio import DataLakeDirectoryClient, DataLakeFileClient
 from quart.datastructures import FileStorage
 
+from prepdocslib.blobmanager import AdlsBlobManager
 from prepdocslib.embeddings import OpenAIEmbeddings
 
+from .mocks import MockSessionChunks, build_zip, mock_indexing_results
+
 
 @pytest.mark.asyncio
 @pytest.mark.parametrize("directory_exists", [True, False])
@@ -54,6 +58,8 @@ async def test_upload_file(auth_client, monkeypatch, mock_data_lake_service_clie
 
     async def mock_upload_file(self, *args, **kwargs):
         assert kwargs.get("overwrite") is True
+        assert kwargs.get("chunk_size") == 4 * 1024 * 1024
+        assert kwargs.get("max_concurrency") == 8
         return None
 
     monkeypatch.setattr(DataLakeFileClient, "upload_data", mock_upload_file)
@@ -65,6 +71,7 @@ async def test_upload_file(auth_client, monkeypatch, mock_data_lake_service_clie
 
     async def mock_upload_documents(self, documents):
         documents_uploaded.extend(documents)
+        return mock_indexing_results(documents)
 
     monkeypatch.setattr(SearchClient, "upload_documents", mock_upload_documents)
     monkeypatch.setattr(OpenAIEmbeddings, "create_embeddings", mock_create_embeddings)
@@ -251,3 +258,112 @@ async def test_delete_uploaded(auth_client, monkeypatch, mock_data_lake_service_
     assert len(deleted_documents) == 1, "It should have only deleted the document solely owned by OID_X"
     assert deleted_documents[0]["id"] == "file-a_txt-7465737420646F63756D656E742E706466"
     assert len(deleted_directories) == 1, "It should have deleted the directory for the file"
+
+
+def mock_zip_session(monkeypatch, zip_bytes: bytes) -> MockSessionChunks:
+    """Serve an upload session's chunks from memory and record the jobs queued for it."""
+    session = MockSessionChunks(zip_bytes)
+    session.jobs = []
+
+    async def mock_upload_session_job(self, upload_id, filename, user_oid):
+        session.jobs.append((upload_id, filename, user_oid))
+
+    monkeypatch.setattr(
+        AdlsBlobManager, "list_session_chunks", lambda self, upload_id: session.list_session_chunks(upload_id)
+    )
+    monkeypatch.setattr(
+        AdlsBlobManager,
+        "download_session_range",
+        lambda self, path, offset, length: session.download_session_range(path, offset, length),
+    )
+    monkeypatch.setattr(AdlsBlobManager, "upload_session_job", mock_upload_session_job)
+    return session
+
+
+async def post_upload_zip_complete(auth_client):
+    return await auth_client.post(
+        "/upload-zip-complete",
+        headers={"Authorization": "Bearer test"},
+        json={"upload_id": "upload-1", "filename": "myapp.zip"},
+    )
+
+
+@pytest.mark.asyncio
+async def test_upload_zip_complete_queues_job(auth_client, monkeypatch):
+    zip_bytes = build_zip({"src/app.ts": b"export const app = 1;", "assets/logo.png": os.urandom(20_000)})
+    session = mock_zip_session(monkeypatch, zip_bytes)
+
+    response = await post_upload_zip_complete(auth_client)
+
+    assert response.status_code == 200
+    result = await response.get_json()
+    assert result["status"] == "queued"
+    assert result["jobId"] == "upload-1"
+    assert session.jobs == [("upload-1", "myapp.zip", "OID_X")]
+    # Only the end of the archive (central directory) is downloaded to validate it
+    assert session.downloaded_bytes < len(zip_bytes) // 2
+
+
+@pytest.mark.asyncio
+async def test_upload_zip_complete_too_many_files(auth_client, monkeypatch):
+    session = mock_zip_session(monkeypatch, build_zip({f"src/file{i}.ts": b"x" for i in range(3)}))
+    monkeypatch.setattr("app.MAX_ZIP_FILE_COUNT", 2)
+
+    response = await post_upload_zip_complete(auth_client)
+
+    assert response.status_code == 400
+    assert (await response.get_json())["message"] == "Zip contains too many files (max 2)"
+    assert session.jobs == []
+
+
+@pytest.mark.asyncio
+async def test_upload_zip_complete_too_large_extracted(auth_client, monkeypatch):
+    session = mock_zip_session(monkeypatch, build_zip({"src/big.ts": b"a" * (2 * 1024 * 1024)}))
+    monkeypatch.setattr("app.MAX_ZIP_EXTRACTED_BYTES", 1024 * 1024)
+
+    response = await post_upload_zip_complete(auth_client)
+
+    assert response.status_code == 400
+    assert (await response.get_json())["message"] == "Zip extracted size exceeds limit of 1 MB"
+    assert session.jobs == []
+
+
+@pytest.mark.asyncio
+async def test_upload_zip_complete_bad_zip(auth_client, monkeypatch):
+    session = mock_zip_session(monkeypatch, b"not a zip archive" * 100)
+
+    response = await post_upload_zip_complete(auth_client)
+
+    assert response.status_code == 400
+    assert (await response.get_json())["message"] == "Invalid or corrupted zip file"
+    assert session.jobs == []
+
+
+@pytest.mark.asyncio
+async def test_upload_zip_complete_download_error(auth_client, monkeypatch):
+    session = mock_zip_session(monkeypatch, build_zip({"src/app.ts": b"export const app = 1;"}))
+
+    async def mock_download_session_range(self, path, offset, length):
+        raise azure.core.exceptions.ResourceNotFoundError("chunk expired")
+
+    monkeypatch.setattr(AdlsBlobManager, "download_session_range", mock_download_session_range)
+
+    response = await post_upload_zip_complete(auth_client)
+
+    assert response.status_code == 400
+    assert (await response.get_json())["message"] == "Invalid or expired upload_id"
+    assert session.jobs == []
+
+
+@pytest.mark.asyncio
+async def test_upload_zip_too_large_extracted(auth_client, monkeypatch):
+    monkeypatch.setattr("app.MAX_ZIP_EXTRACTED_BYTES", 1024 * 1024)
+
+    response = await auth_client.post(
+        "/upload-zip",
+        headers={"Authorization": "Bearer test"},
+        files={"file": FileStorage(BytesIO(build_zip({"src/big.ts": b"a" * (2 * 1024 * 1024)})), filename="a.zip")},
+    )
+
+    assert response.status_code == 400
+    assert (await response.get_json())["message"] == "Zip extracted size exceeds limit of 1 MB"